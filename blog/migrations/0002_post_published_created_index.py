@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("published", True)),
+                fields=["-created_at", "-id"],
+                name="blog_post_pub_created_idx",
+            ),
+        ),
+    ]
@@ -14,6 +14,14 @@ class Post(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Serves the published list/API queries (WHERE published ORDER BY created_at DESC, id DESC).
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(published=True),
+                name="blog_post_pub_created_idx",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return self.title
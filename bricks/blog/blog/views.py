@@ -1,22 +1,117 @@
+import orjson
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.db.models import Prefetch, Q
+from django.db.models.functions import Left
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
 from .models import Post
 
 
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+# Authors for a page of posts in one narrow query instead of joining every User column.
+AUTHOR_PREFETCH = Prefetch("author", queryset=User.objects.only("id", "username"))
+
+
 def post_list(request):
-    posts = Post.objects.filter(published=True)
-    return render(request, "blog/post_list.html", {"posts": posts})
+    posts = (
+        Post.objects.filter(published=True)
+        .prefetch_related(AUTHOR_PREFETCH)
+        .only("title", "slug", "created_at", "author_id")
+        # One extra character so truncatechars:160 still appends an ellipsis.
+        .annotate(excerpt=Left("content", 161))
+        # The pk breaks created_at ties, so no post repeats or vanishes across pages.
+        .order_by("-created_at", "-pk")
+    )
+    paginator = Paginator(posts, getattr(settings, "BLOG_POSTS_PER_PAGE", 10))
+    page = paginator.get_page(request.GET.get("page"))
+    return render(request, "blog/post_list.html", {"posts": page, "page_obj": page})
 
 
 def post_detail(request, slug: str):
-    post = get_object_or_404(Post, slug=slug, published=True)
+    post = get_object_or_404(Post.objects.select_related("author"), slug=slug, published=True)
     return render(request, "blog/post_detail.html", {"post": post})
 
 
-def api_posts(request):
-    posts = Post.objects.filter(published=True).values(
-        "title", "slug", "content", "created_at"
-    )
-    return JsonResponse(list(posts), safe=False)
+def _encode_cursor(created_at, pk: int) -> str:
+    # "<created_at>_<pk>": the pk breaks ties between posts sharing a timestamp.
+    # "Z" rather than "+00:00" keeps the cursor safe to paste into a query string.
+    return f'{created_at.isoformat().replace("+00:00", "Z")}_{pk}'
+
+
+def _decode_cursor(cursor: str):
+    # (created_at, pk), or None when the cursor is malformed.
+    created_at, _, pk = cursor.rpartition("_")
+    try:
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if created_at is None:
+        return None
+    return created_at, pk
+
 
+def _page_row(row, first: bool):
+    # (chunk to send, cursor position) for one row of the page.
+    # The pk only feeds the cursor; it is not part of the payload.
+    pk = row.pop("id")
+    chunk = orjson.dumps(row, option=orjson.OPT_UTC_Z)
+    return (chunk if first else b"," + chunk), (row["created_at"], pk)
 
+
+def _page_tail(last, count: int, limit: int) -> bytes:
+    next_cursor = _encode_cursor(*last) if count == limit else None
+    return b'],"next_cursor":' + orjson.dumps(next_cursor) + b"}"
+
+
+def _iter_page(rows, limit: int):
+    # Serialize row by row so the page is never held in memory.
+    yield b'{"results":['
+    count = 0
+    last = None
+    for row in rows.iterator(chunk_size=500):
+        chunk, last = _page_row(row, not count)
+        yield chunk
+        count += 1
+    yield _page_tail(last, count, limit)
+
+
+async def _aiter_page(rows, limit: int):
+    # ASGI counterpart: Django would drain a sync iterator into a list before
+    # sending it, so under ASGI only an async iterator keeps the page streaming.
+    yield b'{"results":['
+    count = 0
+    last = None
+    async for row in rows.aiterator(chunk_size=500):
+        chunk, last = _page_row(row, not count)
+        yield chunk
+        count += 1
+    yield _page_tail(last, count, limit)
+
+
+def api_posts(request):
+    try:
+        limit = min(int(request.GET.get("limit", API_PAGE_SIZE)), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "Invalid limit"}, status=400)
+    if limit < 1:
+        return JsonResponse({"error": "Invalid limit"}, status=400)
+    posts = Post.objects.filter(published=True)
+    cursor = request.GET.get("cursor")
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+        created_at, pk = position
+        # Keyset pagination on (created_at, pk): stays an index range scan however
+        # deep the client pages, and rows sharing a timestamp are never skipped.
+        posts = posts.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+    rows = posts.order_by("-created_at", "-pk").values("id", "title", "slug", "content", "created_at")[:limit]
+    pages = _aiter_page if isinstance(request, ASGIRequest) else _iter_page
+    return StreamingHttpResponse(pages(rows, limit), content_type="application/json")
@@ -17,6 +17,7 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("bricks/", views.bricks_catalog, name="bricks-catalog"),
     path("bricks/import/", views.import_brick, name="import-brick"),
+    path("bricks/jobs/<str:job_id>/", views.import_brick_job, name="import-brick-job"),
     path("system/", views.system_status, name="system-status"),
     path("demo/", views.demo, name="demo"),
     path("blog/", include("blog.urls")),
@@ -1,26 +1,110 @@
 from __future__ import annotations
 
-import json
+import asyncio
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Tuple
 
+import orjson
+from asgiref.sync import sync_to_async
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
 from django.urls import reverse
+from django.views.decorators.cache import cache_page
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import etag
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+import uuid
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+LEDGER_PATH = BASE_DIR / "tools" / "lego_manifest.jsonl"
+LEGACY_LEDGER_PATH = BASE_DIR / "tools" / "lego_manifest.json"
+AVAILABLE_PATH = BASE_DIR / "tools" / "available_bricks.json"
+# Pre-stringified for subprocess argv/cwd so import_brick does no path work per request
+BRICKS_CLI = str(BASE_DIR / "tools" / "bricks.py")
+BASE_DIR_STR = str(BASE_DIR)
+
+# Parsed JSON keyed by path; entries are reused while (mtime_ns, size) is unchanged.
+_JSON_CACHE: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+_JSON_CACHE_LOCK = threading.Lock()
+
+# Background brick imports keyed by job id. Output is redirected to temp files
+# (not pipes) so a chatty pip install can never block on a full pipe buffer.
+# The registry is per process: a job id only resolves in the worker that
+# started it, so multi-worker deployments need sticky routing for polling.
+# A job is dropped once its finished result has been returned, or after
+# _JOB_TTL seconds if nobody polls it.
+_JOBS: Dict[str, Dict[str, Any]] = {}
+_JOBS_LOCK = threading.Lock()
+_JOB_TTL = 3600
+
+
+def _read_json_cached(path: Path, parse: Callable[[bytes], Any] = orjson.loads) -> Any:
+    # Raises FileNotFoundError for missing files. The result is shared between
+    # requests, so callers must not mutate it.
+    st = path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    with _JSON_CACHE_LOCK:
+        cached = _JSON_CACHE.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        data = parse(path.read_bytes())
+        _JSON_CACHE[path] = (key, data)
+        return data
+
+
+def _parse_ledger_lines(data: bytes) -> Dict[str, Any]:
+    return {"entries": [orjson.loads(line) for line in data.splitlines() if line.strip()]}
 
 
 def _read_ledger() -> Dict[str, Any]:
-    ledger_path = Path(__file__).resolve().parent.parent / "tools" / "lego_manifest.json"
-    if not ledger_path.exists():
+    try:
+        return _read_json_cached(LEDGER_PATH, _parse_ledger_lines)
+    except FileNotFoundError:
+        pass
+    try:
+        # Not migrated yet; tools/bricks.py converts it on its next run
+        return _read_json_cached(LEGACY_LEDGER_PATH)
+    except FileNotFoundError:
         return {"entries": []}
-    return json.loads(ledger_path.read_text(encoding="utf-8"))
 
 
-def home(request: HttpRequest) -> HttpResponse:
-    ledger = _read_ledger()
+def _files_etag(*paths: Path) -> str:
+    parts = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            parts.append("missing")
+        else:
+            parts.append(f"{st.st_mtime_ns}-{st.st_size}")
+    return ":".join(parts)
+
+
+def _read_available_bricks() -> List[Dict[str, Any]]:
+    try:
+        # Copy each brick so the caller can update its status without touching the cached data.
+        return [dict(b) for b in _read_json_cached(AVAILABLE_PATH)]
+    except FileNotFoundError:
+        return [
+            {"name": "blog", "category": "API", "status": "Installed", "description": "Simple blog app"},
+            {"name": "allauth", "category": "Auth", "status": "Installed", "description": "Accounts and auth"},
+            {"name": "celery", "category": "Tasks", "status": "Available", "description": "Background workers"},
+            {"name": "postgres", "category": "DB", "status": "Available", "description": "PostgreSQL database"},
+            {"name": "sentry", "category": "Observability", "status": "Available", "description": "Error monitoring"},
+        ]
+
+
+# Pages built from the ledger only change when it is rewritten, so browsers
+# can revalidate with If-None-Match and get a 304 without a re-render.
+# File reads run off the event loop so a slow disk never stalls an ASGI worker.
+@etag(lambda request: _files_etag(LEDGER_PATH, LEGACY_LEDGER_PATH))
+async def home(request: HttpRequest) -> HttpResponse:
+    ledger = await sync_to_async(_read_ledger, thread_sensitive=False)()
     bricks = [e["brick"] for e in ledger.get("entries", [])]
     stats = {
         "num_bricks": len(bricks),
@@ -29,27 +113,21 @@ def home(request: HttpRequest) -> HttpResponse:
     return render(request, "home.html", {"bricks": bricks, "stats": stats})
 
 
-def bricks_catalog(request: HttpRequest) -> HttpResponse:
-    ledger = _read_ledger()
+@etag(lambda request: _files_etag(LEDGER_PATH, LEGACY_LEDGER_PATH, AVAILABLE_PATH))
+async def bricks_catalog(request: HttpRequest) -> HttpResponse:
+    ledger, available = await asyncio.gather(
+        sync_to_async(_read_ledger, thread_sensitive=False)(),
+        sync_to_async(_read_available_bricks, thread_sensitive=False)(),
+    )
     installed = [{"name": e["brick"], "source": e.get("source", "")} for e in ledger.get("entries", [])]
     installed_names = {i["name"] for i in installed}
-    available_path = Path(__file__).resolve().parent.parent / "tools" / "available_bricks.json"
-    if available_path.exists():
-        available = json.loads(available_path.read_text(encoding="utf-8"))
-    else:
-        available = [
-            {"name": "blog", "category": "API", "status": "Installed", "description": "Simple blog app"},
-            {"name": "allauth", "category": "Auth", "status": "Installed", "description": "Accounts and auth"},
-            {"name": "celery", "category": "Tasks", "status": "Available", "description": "Background workers"},
-            {"name": "postgres", "category": "DB", "status": "Available", "description": "PostgreSQL database"},
-            {"name": "sentry", "category": "Observability", "status": "Available", "description": "Error monitoring"},
-        ]
     for b in available:
         if b["name"] in installed_names:
             b["status"] = "Installed"
     return render(request, "bricks.html", {"available": available, "installed": installed})
 
 
+@cache_page(60)
 def system_status(request: HttpRequest) -> HttpResponse:
     checks = [
         {"name": "OpenAPI schema", "url": "/api/schema/", "ok": True},
@@ -59,10 +137,34 @@ def system_status(request: HttpRequest) -> HttpResponse:
     return render(request, "system.html", {"checks": checks})
 
 
+@cache_page(60)
 def demo(request: HttpRequest) -> HttpResponse:
     return render(request, "demo.html")
 
 
+_REMOTE_PREFIXES = ("http://", "https://", "ssh://", "git@")
+
+
+def _is_remote(source: str) -> bool:
+    return source.startswith(_REMOTE_PREFIXES)
+
+
+def _close_job_files(job: Dict[str, Any]) -> None:
+    for name in ("stdout", "stderr"):
+        f = job.pop(name, None)
+        if f is not None:
+            f.close()
+
+
+def _reap_jobs() -> None:
+    # Caller holds _JOBS_LOCK. poll() also reaps the child, so no zombie is left behind.
+    now = time.monotonic()
+    for job_id, job in list(_JOBS.items()):
+        if now - job["started"] > _JOB_TTL and job["proc"].poll() is not None:
+            _close_job_files(job)
+            del _JOBS[job_id]
+
+
 @csrf_exempt
 def import_brick(request: HttpRequest) -> JsonResponse:
     if request.method != "POST":
@@ -70,17 +172,65 @@ def import_brick(request: HttpRequest) -> JsonResponse:
     source = request.POST.get("source", "").strip()
     if not source:
         return JsonResponse({"success": False, "error": "Missing source"}, status=400)
-    # Decide install vs apply
-    try:
-        if source.startswith("http://") or source.startswith("https://") or "/" in source and not Path(source).exists():
-            cmd = [sys.executable, str(Path(__file__).resolve().parent.parent / "tools" / "bricks.py"), "install", source]
-        else:
-            # local path
-            cmd = [sys.executable, str(Path(__file__).resolve().parent.parent / "tools" / "bricks.py"), "apply", source, "--yes"]
-        proc = subprocess.run(cmd, capture_output=True, text=True, cwd=str(Path(__file__).resolve().parent.parent))
-        ok = proc.returncode == 0
-        return JsonResponse({"success": ok, "stdout": proc.stdout, "stderr": proc.stderr})
-    except Exception as e:
-        return JsonResponse({"success": False, "error": str(e)}, status=500)
-
-
+    # Decide install vs apply; URLs never need a filesystem check
+    if _is_remote(source):
+        args = ["install", source]
+    elif Path(source).exists():
+        # local path
+        args = ["apply", source, "--yes"]
+    elif "/" in source:
+        # GitHub owner/repo shorthand
+        args = ["install", source]
+    else:
+        return JsonResponse({"success": False, "error": f"Brick not found: {source}"}, status=404)
+    cmd = [sys.executable, BRICKS_CLI, *args]
+    files: Dict[str, Any] = {}
+    with _JOBS_LOCK:
+        _reap_jobs()
+        # Imports edit settings.py, urls.py and requirements.txt in place, so
+        # only one may run at a time.
+        for running_id, job in _JOBS.items():
+            if job["proc"].poll() is None:
+                return JsonResponse(
+                    {"success": False, "error": "Another import is running", "job_id": running_id},
+                    status=409,
+                )
+        try:
+            # pip install + migrate can take tens of seconds; run the CLI in the
+            # background and let the client poll import_brick_job for the result.
+            files["stdout"] = tempfile.TemporaryFile()
+            files["stderr"] = tempfile.TemporaryFile()
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=files["stdout"],
+                stderr=files["stderr"],
+                cwd=BASE_DIR_STR,
+            )
+        except Exception as e:
+            _close_job_files(files)
+            return JsonResponse({"success": False, "error": str(e)}, status=500)
+        job_id = uuid.uuid4().hex
+        _JOBS[job_id] = {"proc": proc, "started": time.monotonic(), **files}
+    return JsonResponse(
+        {"success": True, "job_id": job_id, "status_url": reverse("import-brick-job", args=[job_id])},
+        status=202,
+    )
+
+
+def import_brick_job(request: HttpRequest, job_id: str) -> JsonResponse:
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+        if job is None:
+            return JsonResponse({"success": False, "error": "Unknown job"}, status=404)
+        returncode = job["proc"].poll()
+        if returncode is None:
+            return JsonResponse({"status": "running"})
+        # Finished: the result is handed out once and the job forgotten
+        del _JOBS[job_id]
+    outputs = {}
+    for name in ("stdout", "stderr"):
+        with job.pop(name) as f:
+            f.seek(0)
+            outputs[name] = f.read().decode("utf-8", errors="replace")
+    return JsonResponse({"status": "done", "success": returncode == 0, **outputs})
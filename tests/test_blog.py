@@ -0,0 +1,108 @@
+import json
+import warnings
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import AsyncClient, Client
+
+from blog.models import Post
+
+
+@pytest.fixture
+def posts(db):
+    author = User.objects.create_user("writer")
+    return [
+        Post.objects.create(title=f"Post {i}", slug=f"post-{i}", author=author, content="Body " * 50, published=True)
+        for i in range(5)
+    ]
+
+
+def test_post_list_constant_queries(posts, django_assert_num_queries):
+    client = Client()
+    # Paginator COUNT, the page of posts, and one prefetch for their authors.
+    with django_assert_num_queries(3):
+        resp = client.get("/blog/")
+    assert resp.status_code == 200
+    assert b"Post 4" in resp.content and b"writer" in resp.content
+    assert "Body Body" in resp.content.decode() and "…" in resp.content.decode()
+
+
+def test_api_posts_streams_json(posts):
+    client = Client()
+    resp = client.get("/blog/api/")
+    assert resp.status_code == 200
+    assert resp.streaming
+    data = json.loads(b"".join(resp.streaming_content))
+    assert [p["slug"] for p in data["results"]] == [f"post-{i}" for i in reversed(range(5))]
+    assert set(data["results"][0]) == {"title", "slug", "content", "created_at"}
+    assert data["next_cursor"] is None
+
+
+def test_api_posts_keyset_pagination(posts):
+    client = Client()
+    first = json.loads(b"".join(client.get("/blog/api/", {"limit": 3}).streaming_content))
+    assert [p["slug"] for p in first["results"]] == ["post-4", "post-3", "post-2"]
+    resp = client.get("/blog/api/", {"limit": 3, "cursor": first["next_cursor"]})
+    second = json.loads(b"".join(resp.streaming_content))
+    assert [p["slug"] for p in second["results"]] == ["post-1", "post-0"]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.parametrize("cursor", ["yesterday", "2025-08-10T00:00:00Z", "2025-08-10T00:00:00Z_x", "nope_3"])
+def test_api_posts_rejects_bad_cursor(db, cursor):
+    resp = Client().get("/blog/api/", {"cursor": cursor})
+    assert resp.status_code == 400
+
+
+def test_api_posts_gzip(posts):
+    resp = Client().get("/blog/api/", HTTP_ACCEPT_ENCODING="gzip")
+    assert resp["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp["Vary"]
+
+
+def test_api_posts_keyset_pagination_keeps_timestamp_ties(db):
+    author = User.objects.create_user("writer")
+    posts = [
+        Post.objects.create(title=f"Tie {i}", slug=f"tie-{i}", author=author, content="x", published=True)
+        for i in range(4)
+    ]
+    Post.objects.update(created_at=posts[0].created_at)
+    client = Client()
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = json.loads(b"".join(client.get("/blog/api/", params).streaming_content))
+        seen += [p["slug"] for p in page["results"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["tie-3", "tie-2", "tie-1", "tie-0"]
+
+
+def test_post_list_pages_keep_timestamp_ties(db, settings):
+    settings.BLOG_POSTS_PER_PAGE = 2
+    author = User.objects.create_user("writer")
+    posts = [
+        Post.objects.create(title=f"Tie {i}", slug=f"tie-{i}", author=author, content="x", published=True)
+        for i in range(4)
+    ]
+    Post.objects.update(created_at=posts[0].created_at)
+    client = Client()
+    pages = [[p.slug for p in client.get("/blog/", {"page": n}).context["posts"]] for n in (1, 2)]
+    assert pages == [["tie-3", "tie-2"], ["tie-1", "tie-0"]]
+
+
+def test_api_posts_streams_asynchronously_under_asgi(posts):
+    async def fetch():
+        resp = await AsyncClient().get("/blog/api/", {"limit": 3})
+        assert resp.is_async
+        return b"".join([chunk async for chunk in resp.streaming_content])
+
+    with warnings.catch_warnings():
+        # Django warns when it has to buffer a sync iterator for ASGI
+        warnings.filterwarnings("error", message="StreamingHttpResponse must consume synchronous iterators")
+        data = json.loads(async_to_sync(fetch)())
+    assert [p["slug"] for p in data["results"]] == ["post-4", "post-3", "post-2"]
+    assert data["next_cursor"]
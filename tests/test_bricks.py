@@ -0,0 +1,428 @@
+import ast
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from tools import bricks
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.setattr(bricks, "REQUIREMENTS_PATH", tmp_path / "requirements.txt")
+    monkeypatch.setattr(bricks, "ENV_EXAMPLE_PATH", tmp_path / ".env.example")
+    return tmp_path
+
+
+def test_ensure_requirements_matches_by_name(workspace):
+    bricks.REQUIREMENTS_PATH.write_text("Django>=5.0,<6.0\ndjango-foo==1.0\n", encoding="utf-8")
+    actions = bricks._ensure_requirements(["django>=5.1", "django-cors-headers>=4.4", "Django-Cors-Headers"])
+    assert actions == ["add:django-cors-headers>=4.4"]
+    assert bricks.REQUIREMENTS_PATH.read_text(encoding="utf-8").splitlines()[-1] == "django-cors-headers>=4.4"
+
+
+def test_ensure_requirements_keeps_distinct_vcs_deps(workspace):
+    bricks.REQUIREMENTS_PATH.write_text("-r base.txt\nhttps://example.com/pkg.whl\n", encoding="utf-8")
+    deps = ["git+https://github.com/a/x.git", "git+https://github.com/b/y.git#egg=y", "https://example.com/pkg.whl", "git+https://github.com/a/x.git"]
+    assert bricks._ensure_requirements(deps) == ["add:git+https://github.com/a/x.git", "add:git+https://github.com/b/y.git#egg=y"]
+    assert bricks.REQUIREMENTS_PATH.read_text(encoding="utf-8").splitlines() == [
+        "-r base.txt",
+        "https://example.com/pkg.whl",
+        "git+https://github.com/a/x.git",
+        "git+https://github.com/b/y.git#egg=y",
+    ]
+
+
+def test_diff_matches_requirements_by_name(workspace, tmp_path, capsys):
+    bricks.REQUIREMENTS_PATH.write_text("django-foo==1.0\n", encoding="utf-8")
+    brick = tmp_path / "brick"
+    brick.mkdir()
+    (brick / "brick.json").write_text(json.dumps({"name": "x", "dependencies": ["Django-Foo", "django"]}), encoding="utf-8")
+    bricks._cmd_diff(str(brick))
+    out = capsys.readouterr().out
+    assert "requirements.txt additions:\n+ django\n" in out
+    # captured stdout is not a terminal, so the plan is emitted compactly on one line
+    assert json.loads(out.split("\n", 1)[0])["plan"]["requirements"][0] == {"name": "Django-Foo"}
+
+
+def test_ensure_env_appends_missing_keys(workspace):
+    bricks.ENV_EXAMPLE_PATH.write_bytes(b"# comment\nDEBUG=1\nSECRET_KEY=x")
+    keys = [{"key": "DEBUG", "default": "0"}, {"key": "SENTRY_DSN"}, {"key": "SENTRY_DSN", "default": "dup"}]
+    assert bricks._ensure_env(keys) == ["env:SENTRY_DSN"]
+    assert bricks.ENV_EXAMPLE_PATH.read_bytes() == b"# comment\nDEBUG=1\nSECRET_KEY=x\nSENTRY_DSN=\n"
+    assert bricks._ensure_env(keys) == []
+
+
+@pytest.fixture
+def project(workspace, monkeypatch):
+    (workspace / "config").mkdir()
+    (workspace / "config" / "settings.py").write_text(
+        'INSTALLED_APPS = [\n    "blog",\n]\n\nMIDDLEWARE = [\n]\n', encoding="utf-8"
+    )
+    (workspace / "config" / "urls.py").write_text("urlpatterns = [\n]\n", encoding="utf-8")
+    bricks.REQUIREMENTS_PATH.write_text("Django>=5.1,<6.0\n", encoding="utf-8")
+    monkeypatch.setattr(bricks, "WORKSPACE_ROOT", workspace)
+    monkeypatch.setattr(bricks, "PROJECT_SETTINGS_PATH", workspace / "config" / "settings.py")
+    monkeypatch.setattr(bricks, "PROJECT_URLS_PATH", workspace / "config" / "urls.py")
+    monkeypatch.setattr(bricks, "LEDGER_PATH", workspace / "lego_manifest.jsonl")
+    monkeypatch.setattr(bricks, "LEGACY_LEDGER_PATH", workspace / "lego_manifest.json")
+    calls = []
+    monkeypatch.setattr(bricks.subprocess, "run", lambda cmd, **kwargs: calls.append(cmd))
+    return calls
+
+
+def _write_brick(path, dependencies, installed_apps):
+    path.mkdir()
+    manifest = {"name": path.name, "dependencies": dependencies, "django": {"installed_apps": installed_apps}}
+    (path / "brick.json").write_text(json.dumps(manifest), encoding="utf-8")
+    return str(path)
+
+
+def test_apply_skips_pip_and_migrate_when_nothing_changed(project, tmp_path):
+    bricks.cmd_apply(_write_brick(tmp_path / "noop", ["django>=5.1"], ["blog"]), assume_yes=True)
+    assert project == []
+    bricks.cmd_apply(_write_brick(tmp_path / "reqs", ["orjson>=3.8"], ["blog"]), assume_yes=True)
+    assert [cmd[:2] for cmd in project] == [["pip", "install"]]
+    project.clear()
+    bricks.cmd_apply(_write_brick(tmp_path / "apps", [], ["polls"]), assume_yes=True)
+    assert [cmd[1:3] for cmd in project] == [[str(tmp_path / "manage.py"), "migrate"]]
+
+
+def test_apply_exec_migrate_records_ledger_first(project, tmp_path, monkeypatch):
+    execs = []
+    monkeypatch.setattr(bricks, "_CAN_EXEC", True)
+    monkeypatch.setattr(bricks.os, "execvp", lambda file, args: execs.append((args, bricks.load_ledger())))
+    bricks.cmd_apply(_write_brick(tmp_path / "apps", [], ["polls"]), assume_yes=True, exec_migrate=True)
+    assert project == []
+    (args, ledger), = execs
+    assert args[1:3] == [str(tmp_path / "manage.py"), "migrate"]
+    assert [e["brick"] for e in ledger["entries"]] == ["apps"]
+
+
+def test_print_plan_is_ascii_and_accepts_non_str_keys(capsys):
+    plan = bricks.plan_integration({"name": "é", "django": {"settings": {True: "on", 8000: "x"}}, "dependencies": ["café"]})
+    bricks.print_plan(plan)
+    out = capsys.readouterr().out
+    assert out.isascii() and "caf\\u00e9" in out
+    assert json.loads(out.split("\n", 1)[1])["settings"]["blocks"][0]["value"] == {"true": "on", "8000": "x"}
+
+
+def test_apply_exec_migrate_runs_child_where_exec_cannot_replace(project, tmp_path, monkeypatch):
+    monkeypatch.setattr(bricks, "_CAN_EXEC", False)
+    monkeypatch.setattr(bricks.os, "execvp", lambda file, args: pytest.fail("execvp on a platform without exec"))
+    bricks.cmd_apply(_write_brick(tmp_path / "apps", [], ["polls"]), assume_yes=True, exec_migrate=True)
+    assert [cmd[1:3] for cmd in project] == [[str(tmp_path / "manage.py"), "migrate"]]
+
+
+def test_plan_and_apply_plans_once(project, tmp_path, monkeypatch):
+    plans = []
+    plan_integration = bricks.plan_integration
+    monkeypatch.setattr(bricks, "plan_integration", lambda m: plans.append(m) or plan_integration(m))
+    bricks._plan_and_apply(Path(_write_brick(tmp_path / "once", [], ["blog"])))
+    assert len(plans) == 1
+
+
+def test_apply_settings_mutations_is_idempotent(tmp_path):
+    settings = tmp_path / "settings.py"
+    settings.write_text(
+        'INSTALLED_APPS = [\n    "django.contrib.admin",\n    "blog",]\n\nMIDDLEWARE = [\n    "a.Middleware"\n]\n',
+        encoding="utf-8",
+    )
+    mutations = {"INSTALLED_APPS": ["blog", "polls"], "MIDDLEWARE": ["b.Middleware"]}
+    assert bricks._apply_settings_mutations(settings, mutations) == [
+        "add:INSTALLED_APPS:polls",
+        "add:MIDDLEWARE:b.Middleware",
+    ]
+    assert bricks._apply_settings_mutations(settings, mutations) == []
+    content = settings.read_text(encoding="utf-8")
+    assert content.count('"polls"') == 1
+    assert '"a.Middleware",\n    "b.Middleware",\n]' in content
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        (
+            'INSTALLED_APPS = [\n    "a"  # core, required\n]\n',
+            'INSTALLED_APPS = [\n    "a",  # core, required\n    "b",\n]\n',
+        ),
+        (
+            'INSTALLED_APPS = [\n    "a",  # café, ok\n]\n',
+            'INSTALLED_APPS = [\n    "a",  # café, ok\n    "b",\n]\n',
+        ),
+        (
+            'INSTALLED_APPS = [\n    "a"\n    # trailing, note\n    ,\n]\n',
+            'INSTALLED_APPS = [\n    "a"\n    # trailing, note\n    ,\n    "b",\n]\n',
+        ),
+        ('INSTALLED_APPS = [  # none yet, ok\n]\n', 'INSTALLED_APPS = [  # none yet, ok\n    "b",\n]\n'),
+    ],
+)
+def test_apply_settings_mutations_ignores_commas_in_comments(tmp_path, source, expected):
+    settings = tmp_path / "settings.py"
+    settings.write_text(source, encoding="utf-8")
+    assert bricks._apply_settings_mutations(settings, {"INSTALLED_APPS": ["b"]}) == ["add:INSTALLED_APPS:b"]
+    content = settings.read_text(encoding="utf-8")
+    assert content == expected
+    namespace: dict = {}
+    exec(content, namespace)
+    assert namespace["INSTALLED_APPS"] == (["a", "b"] if '"a"' in source else ["b"])
+
+
+def test_ensure_url_includes_appends_after_comment(tmp_path, monkeypatch):
+    urls = tmp_path / "urls.py"
+    urls.write_text(
+        'from django.urls import path, include\n\nurlpatterns = [\n    path("", home)  # home, root\n]\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(bricks, "PROJECT_URLS_PATH", urls)
+    assert bricks._ensure_url_includes([("blog.urls", "blog/")]) == ["url:blog/->blog.urls"]
+    assert urls.read_text(encoding="utf-8").endswith(
+        'path("", home),  # home, root\n    path("blog/", include("blog.urls")),\n]\n'
+    )
+
+
+def test_ensure_url_includes_adds_import_and_routes_once(tmp_path, monkeypatch):
+    urls = tmp_path / "urls.py"
+    urls.write_text(
+        "from django.urls import path\n\nurlpatterns = [\n    path(\"\", home),\n# OpenAPI schema and docs\n]\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(bricks, "PROJECT_URLS_PATH", urls)
+    actions = bricks._ensure_url_includes([("blog.urls", "blog/"), ("polls.urls", "polls/")])
+    assert actions == ["import:include", "url:blog/->blog.urls", "url:polls/->polls.urls"]
+    assert bricks._ensure_url_includes([("blog.urls", "blog/")]) == []
+    content = urls.read_text(encoding="utf-8")
+    assert "from django.urls import path, include\n" in content
+    assert content.index('include("polls.urls")') < content.index("# OpenAPI schema and docs")
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "",
+        '"""URL config."""\n',
+        '"""URL config."""\nfrom __future__ import annotations\n',
+        "from __future__ import annotations\n\nimport os\n",
+        "from django.urls import (\n    path,\n)\n",
+    ],
+)
+def test_ensure_url_includes_adds_import_in_a_valid_place(tmp_path, monkeypatch, header):
+    urls = tmp_path / "urls.py"
+    urls.write_text(header + "\nurlpatterns = []", encoding="utf-8")
+    monkeypatch.setattr(bricks, "PROJECT_URLS_PATH", urls)
+    assert bricks._ensure_url_includes([("blog.urls", "blog/")])[0] == "import:include"
+    content = urls.read_text(encoding="utf-8")
+    tree = ast.parse(content)
+    assert any(isinstance(n, ast.ImportFrom) and n.module == "django.urls" and "include" in [a.name for a in n.names] for n in tree.body)
+    assert bricks._ensure_url_includes([("blog.urls", "blog/")]) == []
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        'INSTALLED_APPS = [\n    "a",\n] + LOCAL_APPS\n',
+        'INSTALLED_APPS: list = [\n    "a",\n]\n',
+        'INSTALLED_APPS = [\n    "a",\n] + LOCAL_APPS + THIRD_PARTY_APPS\n',
+    ],
+)
+def test_apply_settings_mutations_finds_concatenated_and_annotated_lists(tmp_path, source):
+    settings = tmp_path / "settings.py"
+    settings.write_text(source, encoding="utf-8")
+    assert bricks._apply_settings_mutations(settings, {"INSTALLED_APPS": ["b"]}) == ["add:INSTALLED_APPS:b"]
+    assert settings.read_text(encoding="utf-8") == source.replace('"a",\n]', '"a",\n    "b",\n]')
+
+
+def test_ensure_url_includes_extends_urlpatterns_plus_static(tmp_path, monkeypatch):
+    urls = tmp_path / "urls.py"
+    urls.write_text(
+        'from django.urls import path, include\n\nurlpatterns = [\n    path("", home),\n] + static(settings.MEDIA_URL)\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(bricks, "PROJECT_URLS_PATH", urls)
+    assert bricks._ensure_url_includes([("blog.urls", "blog/")]) == ["url:blog/->blog.urls"]
+    assert urls.read_text(encoding="utf-8").endswith(
+        '    path("blog/", include("blog.urls")),\n] + static(settings.MEDIA_URL)\n'
+    )
+
+
+def test_missing_list_targets_warn_on_stderr(tmp_path, monkeypatch, capsys):
+    settings = tmp_path / "settings.py"
+    settings.write_text("INSTALLED_APPS = get_apps()\n", encoding="utf-8")
+    urls = tmp_path / "urls.py"
+    urls.write_text("urlpatterns = build()\n", encoding="utf-8")
+    monkeypatch.setattr(bricks, "PROJECT_URLS_PATH", urls)
+    assert bricks._apply_settings_mutations(settings, {"INSTALLED_APPS": ["b"]}) == []
+    assert bricks._ensure_url_includes([("blog.urls", "blog/")]) == []
+    err = capsys.readouterr().err
+    assert "no INSTALLED_APPS list found" in err and "no urlpatterns list found" in err
+
+
+def test_read_manifest_cached_until_modified(tmp_path):
+    manifest = tmp_path / "brick.yaml"
+    manifest.write_text("name: one\n", encoding="utf-8")
+    first = bricks.read_manifest(tmp_path)
+    assert bricks.read_manifest(tmp_path) is first
+    manifest.write_text("name: two\n", encoding="utf-8")
+    st = manifest.stat()
+    os.utime(manifest, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert bricks.read_manifest(tmp_path) == {"name": "two"}
+
+
+def test_read_manifest_shares_cache_across_path_spellings(tmp_path, monkeypatch):
+    (tmp_path / "brick.yaml").write_text("name: shared\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    assert bricks.read_manifest(Path(".")) is bricks.read_manifest(tmp_path)
+
+
+def test_read_manifest_writes_and_uses_json_sidecar(tmp_path):
+    manifest = tmp_path / "brick.yaml"
+    manifest.write_text("name: blog\ndependencies:\n  - markdown>=3.4\n", encoding="utf-8")
+    st = manifest.stat()
+    expected = {"name": "blog", "dependencies": ["markdown>=3.4"]}
+    assert bricks._read_manifest_cached(str(manifest), st.st_mtime_ns, st.st_size) == expected
+    sidecar = tmp_path / "brick.yaml.jsoncache"
+    assert json.loads(sidecar.read_bytes()) == {"source": [st.st_mtime_ns, st.st_size], "manifest": expected}
+    sidecar.write_text(json.dumps({"source": [st.st_mtime_ns, st.st_size], "manifest": {"name": "from-sidecar"}}))
+    bricks._read_manifest_cached.cache_clear()
+    assert bricks._read_manifest_cached(str(manifest), st.st_mtime_ns, st.st_size) == {"name": "from-sidecar"}
+
+
+def test_read_manifest_ignores_sidecar_for_other_yaml_revision(tmp_path):
+    manifest = tmp_path / "brick.yaml"
+    manifest.write_text("name: one\n", encoding="utf-8")
+    st = manifest.stat()
+    bricks._read_manifest_cached(str(manifest), st.st_mtime_ns, st.st_size)
+    # Rewritten within the same mtime tick: only the size tells the revisions apart
+    manifest.write_text("name: three\n", encoding="utf-8")
+    os.utime(manifest, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert bricks.read_manifest(tmp_path) == {"name": "three"}
+
+
+def test_read_manifest_skips_sidecar_for_non_json_values(tmp_path):
+    (tmp_path / "brick.yaml").write_text("name: dated\nreleased: 2025-08-10\n", encoding="utf-8")
+    assert str(bricks.read_manifest(tmp_path)["released"]) == "2025-08-10"
+    assert not (tmp_path / "brick.yaml.jsoncache").exists()
+
+
+@pytest.mark.parametrize(
+    "repo, url",
+    [
+        ("owner/repo", "https://github.com/owner/repo.git"),
+        ("https://example.com/x/y", "https://example.com/x/y"),
+        ("git@github.com:owner/repo.git", "git@github.com:owner/repo.git"),
+    ],
+)
+def test_normalize_repo_to_url(repo, url):
+    assert bricks._normalize_repo_to_url(repo) == url
+    assert bricks._normalize_repo_to_url(repo) is bricks._normalize_repo_to_url(repo)
+
+
+@pytest.mark.parametrize("repo", ["owner/repo\n", "/abs/path", "just-a-name", "owner/repo/extra"])
+def test_normalize_repo_to_url_rejects(repo):
+    with pytest.raises(ValueError):
+        bricks._normalize_repo_to_url(repo)
+
+
+def test_ledger_appends_json_lines_and_migrates_legacy(tmp_path, monkeypatch):
+    monkeypatch.setattr(bricks, "LEDGER_PATH", tmp_path / "lego_manifest.jsonl")
+    monkeypatch.setattr(bricks, "LEGACY_LEDGER_PATH", tmp_path / "lego_manifest.json")
+    bricks.LEGACY_LEDGER_PATH.write_text(json.dumps({"entries": [{"brick": "old"}]}), encoding="utf-8")
+    bricks.append_ledger_entry({"brick": "new", "actions": []})
+    assert bricks.load_ledger() == {"entries": [{"brick": "old"}, {"brick": "new", "actions": []}]}
+    assert len(bricks.LEDGER_PATH.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_find_brick_dir_prefers_shallowest_and_skips_dot_dirs(tmp_path):
+    (tmp_path / ".git" / "x").mkdir(parents=True)
+    (tmp_path / ".git" / "x" / "brick.yaml").write_text("name: hidden\n", encoding="utf-8")
+    (tmp_path / "a" / "deep").mkdir(parents=True)
+    (tmp_path / "a" / "deep" / "brick.yaml").write_text("name: deep\n", encoding="utf-8")
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "brick.json").write_text("{}", encoding="utf-8")
+    assert bricks._find_brick_dir(tmp_path) == tmp_path / "b"
+    assert bricks._find_brick_dir(tmp_path / "a") == tmp_path / "a" / "deep"
+    assert bricks._find_brick_dir(tmp_path / "missing") is None
+
+
+def test_scan_repo_finds_apps_py_when_there_is_no_manifest(tmp_path):
+    (tmp_path / "src" / "polls").mkdir(parents=True)
+    (tmp_path / "src" / "polls" / "apps.py").write_text("", encoding="utf-8")
+    (tmp_path / "src" / "polls" / "urls.py").write_text("", encoding="utf-8")
+    brick_dir, apps_py = bricks._scan_repo(tmp_path)
+    assert brick_dir is None and apps_py == tmp_path / "src" / "polls" / "apps.py"
+    _, manifest = bricks._auto_detect_manifest(tmp_path, apps_py, persist=False)
+    assert not (tmp_path / "brick.yaml").exists()
+    assert manifest["django"]["installed_apps"] == ["polls"]
+    assert manifest["django"]["urls"] == [{"include": "polls.urls", "mount": "/polls/"}]
+    assert manifest["dependencies"] == []
+
+
+def test_auto_detect_manifest_keeps_first_20_requirements(tmp_path):
+    (tmp_path / "polls").mkdir()
+    (tmp_path / "polls" / "apps.py").write_text("", encoding="utf-8")
+    (tmp_path / "requirements.txt").write_text(
+        "# pinned\n\n" + "".join(f"pkg{i}==1.0\n" for i in range(30)), encoding="utf-8"
+    )
+    _, manifest = bricks._auto_detect_manifest(tmp_path)
+    assert manifest["dependencies"] == [f"pkg{i}==1.0" for i in range(20)]
+
+
+def test_find_brick_dir_breaks_ties_by_name(tmp_path):
+    for name in ("zeta", "alpha", "mid"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "brick.yml").write_text("name: x\n", encoding="utf-8")
+    assert bricks._find_brick_dir(tmp_path) == tmp_path / "alpha"
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_list_streams_same_json_as_dump(tmp_path, monkeypatch, capsys, compact):
+    monkeypatch.setattr(bricks, "LEDGER_PATH", tmp_path / "lego_manifest.jsonl")
+    monkeypatch.setattr(bricks, "LEGACY_LEDGER_PATH", tmp_path / "lego_manifest.json")
+    for entries in ([], [{"brick": "a", "actions": [{"file": "x", "type": "é"}]}, {"brick": "b", "actions": []}]):
+        for entry in entries:
+            bricks.append_ledger_entry(entry)
+        bricks.cmd_list(compact=compact)
+        streamed = capsys.readouterr().out
+        bricks._write_json_stdout({"entries": entries}, compact)
+        assert streamed == capsys.readouterr().out
+
+
+def test_ensure_demo_brick_writes_an_applicable_brick(tmp_path, monkeypatch):
+    monkeypatch.setattr(bricks, "WORKSPACE_ROOT", tmp_path)
+    demo = bricks._ensure_demo_brick()
+    assert bricks.read_manifest(demo)["django"]["installed_apps"] == ["polls"]
+    assert "name = 'polls'" in (demo / "polls" / "apps.py").read_text(encoding="utf-8")
+    assert (demo / "polls" / "templates" / "polls" / "index.html").is_file()
+
+
+def test_ensure_demo_brick_skips_existing_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(bricks, "WORKSPACE_ROOT", tmp_path)
+    demo = bricks._ensure_demo_brick()
+    (demo / "polls" / "views.py").write_text("# edited\n", encoding="utf-8")
+    assert bricks._ensure_demo_brick() == demo
+    assert (demo / "polls" / "views.py").read_text(encoding="utf-8") == "# edited\n"
+    (demo / "polls" / "urls.py").unlink()
+    bricks._ensure_demo_brick()
+    assert (demo / "polls" / "urls.py").is_file()
+
+
+def test_build_parser_apply_flags():
+    args = bricks._build_parser().parse_args(["apply", "bricks/blog", "--yes", "--exec-migrate"])
+    assert (args.cmd, args.path, args.assume_yes, args.exec_migrate) == ("apply", "bricks/blog", True, True)
+
+
+def test_edits_keep_crlf_line_endings(project):
+    bricks.REQUIREMENTS_PATH.write_bytes(b"Django>=5.1,<6.0\r\n")
+    bricks.ENV_EXAMPLE_PATH.write_bytes(b"DEBUG=1\r\nSECRET_KEY=x")
+    bricks.PROJECT_SETTINGS_PATH.write_bytes(b'INSTALLED_APPS = [\r\n    "blog",\r\n]\r\n')
+    bricks.PROJECT_URLS_PATH.write_bytes(b'"""URLs."""\r\nurlpatterns = [\r\n    path("", home),\r\n]\r\n')
+    assert bricks._ensure_requirements(["orjson>=3.8"]) == ["add:orjson>=3.8"]
+    assert bricks._ensure_env([{"key": "SENTRY_DSN"}]) == ["env:SENTRY_DSN"]
+    bricks._apply_settings_mutations(bricks.PROJECT_SETTINGS_PATH, {"INSTALLED_APPS": ["polls"]})
+    bricks._ensure_url_includes([("polls.urls", "polls/")])
+    for path in (bricks.REQUIREMENTS_PATH, bricks.ENV_EXAMPLE_PATH, bricks.PROJECT_SETTINGS_PATH, bricks.PROJECT_URLS_PATH):
+        data = path.read_bytes()
+        assert data.count(b"\n") == data.count(b"\r\n"), path.name
+    assert bricks.REQUIREMENTS_PATH.read_bytes() == b"Django>=5.1,<6.0\r\norjson>=3.8\r\n"
+    assert bricks.ENV_EXAMPLE_PATH.read_bytes() == b"DEBUG=1\r\nSECRET_KEY=x\r\nSENTRY_DSN=\r\n"
@@ -0,0 +1,88 @@
+import os
+import time
+
+from django.test import Client
+
+from config import views
+
+
+def test_read_json_cached_reuses_until_file_changes(tmp_path):
+    path = tmp_path / "ledger.json"
+    path.write_text('{"entries": []}', encoding="utf-8")
+    first = views._read_json_cached(path)
+    assert views._read_json_cached(path) is first
+    path.write_text('{"entries": [{"brick": "blog"}]}', encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert views._read_json_cached(path) == {"entries": [{"brick": "blog"}]}
+
+
+def test_bricks_catalog_ok():
+    resp = Client().get("/bricks/")
+    assert resp.status_code == 200
+    assert b"Bricks Catalog" in resp.content
+
+
+def test_import_brick_job_unknown():
+    resp = Client().get("/bricks/jobs/missing/")
+    assert resp.status_code == 404
+
+
+def test_import_brick_unknown_local_path():
+    resp = Client().post("/bricks/import/", {"source": "no-such-brick"})
+    assert resp.status_code == 404
+
+
+def test_import_brick_job_runs_to_completion(tmp_path, monkeypatch):
+    script = tmp_path / "fake_bricks.py"
+    script.write_text("import sys, time\ntime.sleep(0.5)\nprint('applied', *sys.argv[1:])\n", encoding="utf-8")
+    monkeypatch.setattr(views, "BRICKS_CLI", str(script))
+    client = Client()
+    resp = client.post("/bricks/import/", {"source": str(tmp_path)})
+    assert resp.status_code == 202
+    status_url = resp.json()["status_url"]
+    assert client.get(status_url).json() == {"status": "running"}
+    deadline = time.monotonic() + 30
+    while (result := client.get(status_url).json())["status"] == "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert result["success"] is True
+    assert result["stdout"].strip() == f"applied apply {tmp_path} --yes"
+    # The finished job is handed out once, then forgotten
+    assert client.get(status_url).status_code == 404
+
+
+def test_import_brick_rejects_concurrent_import(tmp_path, monkeypatch):
+    script = tmp_path / "fake_bricks.py"
+    script.write_text("import time\ntime.sleep(0.5)\n", encoding="utf-8")
+    monkeypatch.setattr(views, "BRICKS_CLI", str(script))
+    client = Client()
+    first = client.post("/bricks/import/", {"source": str(tmp_path)})
+    assert first.status_code == 202
+    job_id = first.json()["job_id"]
+    second = client.post("/bricks/import/", {"source": str(tmp_path)})
+    assert second.status_code == 409
+    assert second.json()["job_id"] == job_id
+    status_url = first.json()["status_url"]
+    deadline = time.monotonic() + 30
+    while client.get(status_url).json()["status"] == "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    # Once the first import finished, a new one is accepted again
+    third = client.post("/bricks/import/", {"source": str(tmp_path)})
+    assert third.status_code == 202
+    views._JOBS[third.json()["job_id"]]["proc"].wait()
+
+
+def test_home_revalidates_with_etag():
+    client = Client()
+    resp = client.get("/")
+    assert resp.status_code == 200
+    assert client.get("/", HTTP_IF_NONE_MATCH=resp["ETag"]).status_code == 304
+
+
+def test_home_etag_survives_gzip():
+    client = Client()
+    resp = client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    assert resp["Content-Encoding"] == "gzip"
+    assert client.get("/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=resp["ETag"]).status_code == 304
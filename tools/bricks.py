@@ -1,194 +1,510 @@
 import argparse
+import ast
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import io
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Set, Tuple
 import subprocess
-import datetime
+from datetime import datetime, timezone
 import shutil
 import tempfile
+import tokenize
 import re
 import sys
 
-import yaml
-
 
 WORKSPACE_ROOT = Path(__file__).resolve().parent.parent
 PROJECT_SETTINGS_PATH = WORKSPACE_ROOT / "config" / "settings.py"
 PROJECT_URLS_PATH = WORKSPACE_ROOT / "config" / "urls.py"
 REQUIREMENTS_PATH = WORKSPACE_ROOT / "requirements.txt"
 ENV_EXAMPLE_PATH = WORKSPACE_ROOT / ".env.example"
-LEDGER_PATH = WORKSPACE_ROOT / "tools" / "lego_manifest.json"
+LEDGER_PATH = WORKSPACE_ROOT / "tools" / "lego_manifest.jsonl"
+LEGACY_LEDGER_PATH = WORKSPACE_ROOT / "tools" / "lego_manifest.json"
+
+# On Windows os.exec* spawns a new process and exits the caller with status 0
+# straight away, so exec'ing migrate would report success before it finished.
+_CAN_EXEC = os.name != "nt"
+
+_REQ_NAME_RE = re.compile(rb"^\s*([A-Za-z0-9][A-Za-z0-9_.\-]*)")
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_codecs() -> Tuple[Any, Any]:
+    # (Loader, Dumper). PyYAML is imported on first use: list, diff and JSON or
+    # sidecar-cached manifests never touch it, so they skip its import cost.
+    try:
+        # libyaml bindings; several times faster than the pure-Python loader/dumper
+        from yaml import CSafeDumper as dumper
+        from yaml import CSafeLoader as loader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeDumper as dumper
+        from yaml import SafeLoader as loader
+    return loader, dumper
+
+
+def _migrate_legacy_ledger() -> None:
+    # One-time upgrade from the old single-document ledger to JSON Lines
+    if LEDGER_PATH.exists() or not LEGACY_LEDGER_PATH.exists():
+        return
+    entries = json.loads(LEGACY_LEDGER_PATH.read_text(encoding="utf-8")).get("entries", [])
+    LEDGER_PATH.write_text(
+        "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries),
+        encoding="utf-8",
+    )
+
+
+def iter_ledger() -> Iterator[Dict[str, Any]]:
+    # Entries one line at a time, so the whole ledger is never held at once
+    _migrate_legacy_ledger()
+    try:
+        f = open(LEDGER_PATH, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
 
 
 def load_ledger() -> Dict[str, Any]:
-    if not LEDGER_PATH.exists():
-        return {"entries": []}
-    return json.loads(LEDGER_PATH.read_text(encoding="utf-8"))
+    return {"entries": list(iter_ledger())}
 
 
-def save_ledger(ledger: Dict[str, Any]) -> None:
+def append_ledger_entry(entry: Dict[str, Any]) -> None:
+    # Append-only: recording an apply never rewrites earlier entries
+    _migrate_legacy_ledger()
     LEDGER_PATH.parent.mkdir(parents=True, exist_ok=True)
-    LEDGER_PATH.write_text(json.dumps(ledger, indent=2), encoding="utf-8")
+    with open(LEDGER_PATH, "ab") as f:
+        f.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
 
 
 def read_manifest(brick_path: Path) -> Dict[str, Any]:
     for name in ("brick.yaml", "brick.yml", "brick.json"):
         cand = brick_path / name
-        if cand.exists():
-            if cand.suffix in {".yaml", ".yml"}:
-                return yaml.safe_load(cand.read_text(encoding="utf-8"))
-            return json.loads(cand.read_text(encoding="utf-8"))
+        try:
+            st = cand.stat()
+        except FileNotFoundError:
+            continue
+        return _read_manifest_cached(str(cand.resolve()), st.st_mtime_ns, st.st_size)
     raise FileNotFoundError("No brick manifest found (brick.yaml/brick.json)")
 
 
+# Keyed by resolved path, mtime and size so "bricks/blog" and "./bricks/blog"
+# share an entry and an edited manifest is re-read. The parsed dict is shared
+# between callers and must be treated as read-only.
+@functools.lru_cache(maxsize=64)
+def _read_manifest_cached(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    # Both parsers take raw bytes and detect the encoding themselves
+    if not path.endswith((".yaml", ".yml")):
+        return json.loads(Path(path).read_bytes())
+    # A JSON snapshot of this exact YAML (same mtime and size) spares the YAML
+    # parse. Comparing the recorded source stat, not the sidecar's own mtime,
+    # keeps a YAML rewritten within the same timestamp tick from reading stale.
+    sidecar = Path(path + ".jsoncache")
+    try:
+        cached = json.loads(sidecar.read_bytes())
+        if cached.get("source") == [mtime_ns, size]:
+            return cached["manifest"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    import yaml
+
+    manifest = yaml.load(Path(path).read_bytes(), Loader=_yaml_codecs()[0])
+    _write_manifest_sidecar(sidecar, manifest, mtime_ns, size)
+    return manifest
+
+
+def _write_manifest_sidecar(sidecar: Path, manifest: Any, mtime_ns: int, size: int) -> None:
+    try:
+        data = json.dumps({"source": [mtime_ns, size], "manifest": manifest}, separators=(",", ":")).encode("utf-8")
+        # Skip manifests JSON cannot represent faithfully (dates, non-string keys)
+        if json.loads(data)["manifest"] != manifest:
+            return
+        sidecar.write_bytes(data)
+    except (TypeError, ValueError, OSError):
+        # best effort: e.g. read-only brick sources just go without a cache
+        pass
+
+
 def plan_integration(manifest: Dict[str, Any]) -> Dict[str, Any]:
-    plan: Dict[str, Any] = {
-        "requirements": [],
-        "settings": {"installed_apps": [], "middleware": [], "blocks": []},
-        "urls": [],
-        "env": [],
-        "files": [],
-    }
-    for dep in manifest.get("dependencies", []) or []:
-        plan["requirements"].append({"name": dep})
     django_cfg = manifest.get("django", {}) or {}
-    for app in django_cfg.get("installed_apps", []) or []:
-        plan["settings"]["installed_apps"].append(app)
-    for mw in django_cfg.get("middleware", []) or []:
-        plan["settings"]["middleware"].append(mw)
-    if django_cfg.get("settings"):
-        plan["settings"]["blocks"].append({
-            "key_path": [],
-            "merge_strategy": "deep_merge",
-            "value": django_cfg["settings"],
-        })
-    for u in django_cfg.get("urls", []) or []:
-        plan["urls"].append({"mount": u.get("mount"), "include": u.get("include")})
-    for e in (manifest.get("env") or []):
+    return {
+        "requirements": [{"name": dep} for dep in manifest.get("dependencies", []) or []],
+        "settings": {
+            "installed_apps": list(django_cfg.get("installed_apps", []) or []),
+            "middleware": list(django_cfg.get("middleware", []) or []),
+            "blocks": [{
+                "key_path": [],
+                "merge_strategy": "deep_merge",
+                "value": django_cfg["settings"],
+            }] if django_cfg.get("settings") else [],
+        },
+        "urls": [{"mount": u.get("mount"), "include": u.get("include")} for u in django_cfg.get("urls", []) or []],
         # support list of dicts or objects with key/default
-        if isinstance(e, dict) and "key" in e:
-            plan["env"].append(e)
-    return plan
+        "env": [e for e in manifest.get("env") or [] if isinstance(e, dict) and "key" in e],
+        "files": [],
+    }
 
 
 def print_plan(plan: Dict[str, Any]) -> None:
     print("Plan:")
-    print(json.dumps(plan, indent=2))
+    # json rather than orjson: ASCII-escaped output is safe on legacy Windows
+    # consoles, and YAML's non-str setting keys (on:, 1:) are stringified.
+    json.dump(plan, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+def read_and_plan(brick_path: Path) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    manifest = read_manifest(brick_path)
+    return manifest, plan_integration(manifest)
 
 
 def cmd_plan(path: str) -> None:
-    manifest = read_manifest(Path(path))
-    plan = plan_integration(manifest)
+    _, plan = read_and_plan(Path(path))
     print_plan(plan)
 
 
+def _dump_json(data: Any, stream: Any, compact: bool = False) -> None:
+    # json.dump streams chunks into the (buffered) stream instead of building one big string
+    json.dump(
+        data,
+        stream,
+        ensure_ascii=False,
+        separators=(",", ":") if compact else (",", ": "),
+        indent=None if compact else 2,
+    )
+    stream.write("\n")
+
+
 def _write_json_stdout(data: Any, compact: bool = False) -> None:
-    text = json.dumps(data, ensure_ascii=False, separators=(",", ":") if compact else None, indent=None if compact else 2)
-    sys.stdout.write(text + "\n")
+    _dump_json(data, sys.stdout, compact)
+
+
+def _dump_ledger(stream: Any, compact: bool = False) -> None:
+    # Same output as _dump_json({"entries": [...]}), written entry by entry
+    if compact:
+        head, sep, tail = '{"entries":[', ",", "]}\n"
+    else:
+        head, sep, tail = '{\n  "entries": [\n    ', ",\n    ", "\n  ]\n}\n"
+    n = 0
+    for n, entry in enumerate(iter_ledger(), 1):
+        stream.write(sep if n > 1 else head)
+        if compact:
+            json.dump(entry, stream, ensure_ascii=False, separators=(",", ":"))
+        else:
+            stream.write(json.dumps(entry, ensure_ascii=False, indent=2).replace("\n", "\n    "))
+    if n:
+        stream.write(tail)
+    else:
+        _dump_json({"entries": []}, stream, compact)
 
 
 def cmd_list(compact: bool = False, output: str | None = None) -> None:
-    ledger = load_ledger()
     if output:
-        Path(output).write_text(json.dumps(ledger, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        with open(output, "w", encoding="utf-8") as f:
+            _dump_ledger(f)
         # Print only the path so piping stays clean
         _write_json_stdout({"wrote": output}, compact=True)
         return
-    _write_json_stdout(ledger, compact)
+    _dump_ledger(sys.stdout, compact)
+
+
+def _requirement_name(line: bytes) -> bytes | None:
+    # b"Django>=5.0,<6.0" -> b"django"; None for blank lines, comments, options
+    # and URL/VCS references, whose leading word ("git", "https") is no name
+    if b"://" in line or line.lstrip().startswith(b"-"):
+        return None
+    m = _REQ_NAME_RE.match(line)
+    return m.group(1).lower() if m else None
+
+
+def _requirement_key(line: bytes) -> bytes:
+    # What two requirement lines are compared by: the name, else the whole line
+    return _requirement_name(line) or line.strip()
+
+
+def _newline(data: bytes) -> bytes:
+    # Line ending to write into an existing file: keep CRLF files CRLF. A new
+    # or empty file gets the platform newline, as the old text-mode writes did.
+    if b"\r\n" in data:
+        return b"\r\n"
+    return b"\n" if data else os.linesep.encode("ascii")
+
+
+def _read_requirements() -> Tuple[List[bytes], Set[bytes], bytes]:
+    # (lines, keys of the requirements already listed, newline used by the file).
+    # Names and specifiers are ASCII, so the file stays bytes with no
+    # decode/encode round trip.
+    try:
+        data = REQUIREMENTS_PATH.read_bytes()
+    except FileNotFoundError:
+        data = b""
+    lines = data.splitlines()
+    return lines, {_requirement_key(line) for line in lines if line.strip()}, _newline(data)
 
 
 def _ensure_requirements(packages: List[str]) -> List[str]:
     if not packages:
         return []
-    REQUIREMENTS_PATH.touch(exist_ok=True)
-    current = REQUIREMENTS_PATH.read_text(encoding="utf-8").splitlines()
-    normalized = [line.strip() for line in current]
+    current, existing, nl = _read_requirements()
     actions: List[str] = []
     for pkg in packages:
         name = str(pkg)
-        if not any(line.startswith(name) for line in normalized):
-            current.append(name)
+        line = name.encode("utf-8")
+        req_name = _requirement_key(line)
+        if req_name not in existing:
+            current.append(line)
+            existing.add(req_name)
             actions.append(f"add:{name}")
-    REQUIREMENTS_PATH.write_text("\n".join(current) + "\n", encoding="utf-8")
+    if actions:
+        REQUIREMENTS_PATH.write_bytes(nl.join(current) + nl)
     return actions
 
 
-def _insert_into_list_block(file_path: Path, block_name: str, entries: List[str]) -> List[str]:
-    if not entries:
-        return []
-    content = file_path.read_text(encoding="utf-8")
-    start_token = f"{block_name} = ["
-    start_idx = content.find(start_token)
-    if start_idx == -1:
-        # block missing; nothing to do
-        return []
-    end_idx = content.find("]", start_idx)
-    if end_idx == -1:
+# Source edits below locate their targets structurally with ``ast`` instead of
+# searching the text, so they are unaffected by formatting and comments.
+# ast column offsets are UTF-8 byte offsets, hence the edits work on bytes.
+
+def _line_starts(data: bytes) -> List[int]:
+    starts = [0]
+    idx = data.find(b"\n")
+    while idx != -1:
+        starts.append(idx + 1)
+        idx = data.find(b"\n", idx + 1)
+    return starts
+
+
+def _find_list_assignment(tree: ast.Module, name: str) -> ast.List | None:
+    # NAME = [...], NAME: list = [...], and NAME = [...] + static(...) /
+    # [...] + LOCAL_APPS, where the literal list leads the concatenation
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign):
+            targets, value = [node.target], node.value
+        else:
+            continue
+        if not any(isinstance(t, ast.Name) and t.id == name for t in targets):
+            continue
+        while isinstance(value, ast.BinOp) and isinstance(value.op, ast.Add):
+            value = value.left
+        if isinstance(value, ast.List):
+            return value
+    return None
+
+
+def _tokens_between(data: bytes, start: int, stop: int) -> List[Tuple[int, int, int, str]]:
+    # (type, byte start, byte end, string) of the OP and COMMENT tokens in
+    # data[start:stop], a stretch holding only punctuation, comments and blanks.
+    # tokenize columns count characters, so they are mapped back to UTF-8 bytes.
+    text = data[start:stop].decode("utf-8")
+    lines = text.splitlines(keepends=True) or [""]
+    line_offsets = [start]
+    for line in lines:
+        line_offsets.append(line_offsets[-1] + len(line.encode("utf-8")))
+
+    def to_offset(pos: Tuple[int, int]) -> int:
+        row, col = pos
+        return line_offsets[row - 1] + len(lines[row - 1][:col].encode("utf-8"))
+
+    found = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+            if tok.type in (tokenize.OP, tokenize.COMMENT):
+                found.append((tok.type, to_offset(tok.start), to_offset(tok.end), tok.string))
+    except tokenize.TokenError:
+        # An unbalanced bracket in the fragment only upsets tokenize at EOF
+        pass
+    return found
+
+
+def _list_append_edits(data: bytes, starts: List[int], node: ast.List, text: bytes) -> List[Tuple[int, bytes]]:
+    # Splices that append text (new lines of elements) to the list literal.
+    # The last element's trailing comma is a real OP token, never a comma
+    # inside a comment, and a comment on that line stays on that line.
+    close = starts[node.end_lineno - 1] + node.end_col_offset - 1
+    if node.elts:
+        last = node.elts[-1]
+        end = starts[last.end_lineno - 1] + last.end_col_offset
+    else:
+        end = starts[node.lineno - 1] + node.col_offset + 1  # just past "["
+    tokens = _tokens_between(data, end, close)
+    comma = next((t for t in tokens if t[0] == tokenize.OP and t[3] == ","), None)
+    offset = comma[2] if comma else end
+    trailing = next((t for t in tokens if t[1] >= offset), None)
+    if trailing and trailing[0] == tokenize.COMMENT and b"\n" not in data[offset:trailing[1]]:
+        offset = trailing[2]
+    if comma or not node.elts:
+        return [(offset, text)]
+    if offset == end:
+        return [(end, b"," + text)]
+    return [(end, b","), (offset, text)]
+
+
+def _apply_settings_mutations(file_path: Path, mutations: Dict[str, List[str]]) -> List[str]:
+    # One read, one parse and one write for every list block edited
+    if not any(mutations.values()):
         return []
-    list_block = content[start_idx:end_idx]
+    data = file_path.read_bytes()
+    tree = ast.parse(data)
+    starts = _line_starts(data)
+    nl = _newline(data).decode("ascii")
     actions: List[str] = []
-    new_lines = []
-    for entry in entries:
-        quoted = f'    "{entry}",'  # match indentation style
-        if quoted not in list_block and quoted not in content:
-            new_lines.append(quoted)
-            actions.append(f"add:{block_name}:{entry}")
-    if not new_lines:
+    edits: List[Tuple[int, bytes]] = []
+    for block_name, entries in mutations.items():
+        if not entries:
+            continue
+        node = _find_list_assignment(tree, block_name)
+        if node is None:
+            sys.stderr.write(f"Warning: no {block_name} list found in {file_path}; add {', '.join(entries)} by hand\n")
+            continue
+        existing = {e.value for e in node.elts if isinstance(e, ast.Constant) and isinstance(e.value, str)}
+        new_lines = []
+        for entry in entries:
+            if entry not in existing:
+                new_lines.append(f'{nl}    "{entry}",')  # match indentation style
+                existing.add(entry)
+                actions.append(f"add:{block_name}:{entry}")
+        if new_lines:
+            edits += _list_append_edits(data, starts, node, "".join(new_lines).encode("utf-8"))
+    if not edits:
         return []
-    insertion_point = end_idx
-    updated = content[:insertion_point] + "\n" + "\n".join(new_lines) + content[insertion_point:]
-    file_path.write_text(updated, encoding="utf-8")
+    # Splice back to front so earlier offsets stay valid
+    for offset, text in sorted(edits, reverse=True):
+        data = data[:offset] + text + data[offset:]
+    file_path.write_bytes(data)
     return actions
 
 
-def _ensure_url_include(module: str, mount: str) -> List[str]:
-    content = PROJECT_URLS_PATH.read_text(encoding="utf-8")
+def _import_insert_edit(data: bytes, starts: List[int], tree: ast.Module, line: bytes) -> Tuple[int, bytes]:
+    # line ends with the file's own newline
+    # Splice adding an import line next to the existing imports, but never above
+    # the module docstring or a "from __future__" import (which must come first).
+    after = 0  # index of the first line the new import may go before
+    for i, node in enumerate(tree.body):
+        is_docstring = (
+            i == 0
+            and isinstance(node, ast.Expr)
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+        )
+        if not (is_docstring or (isinstance(node, ast.ImportFrom) and node.module == "__future__")):
+            break
+        after = node.end_lineno
+    first_import = next(
+        (n for n in tree.body if isinstance(n, ast.Import) or (isinstance(n, ast.ImportFrom) and n.module != "__future__")),
+        None,
+    )
+    index = first_import.lineno - 1 if first_import is not None and first_import.lineno > after else after
+    if index < len(starts):
+        return starts[index], line
+    # Past the last line of a file without a trailing newline
+    return len(data), _newline(data) + line
+
+
+def _ensure_url_includes(includes: List[Tuple[str, str]]) -> List[str]:
+    if not includes:
+        return []
+    data = PROJECT_URLS_PATH.read_bytes()
+    tree = ast.parse(data)
+    patterns = _find_list_assignment(tree, "urlpatterns")
+    if patterns is None:
+        sys.stderr.write(f"Warning: no urlpatterns list found in {PROJECT_URLS_PATH}; add the brick routes by hand\n")
+        return []
+    starts = _line_starts(data)
+    nl = _newline(data).decode("ascii")
     actions: List[str] = []
+    edits: List[Tuple[int, bytes]] = []
     # ensure include import exists
-    if " include(" not in content and "include" not in content.splitlines()[1]:
-        if "from django.urls import path" in content and "include" not in content:
-            content = content.replace(
-                "from django.urls import path",
-                "from django.urls import path, include",
-            )
-            actions.append("import:include")
-    line = f'    path("{mount}", include("{module}")),\n'
-    if line not in content:
-        # insert before schema if present else append before last bracket
-        insert_anchor = "# OpenAPI schema and docs"
-        idx = content.find(insert_anchor)
-        if idx == -1:
-            idx = content.rfind("]\n")
-        if idx == -1:
-            idx = len(content)
-        content = content[:idx] + line + content[idx:]
-        actions.append(f"url:{mount}->{module}")
-    PROJECT_URLS_PATH.write_text(content, encoding="utf-8")
+    urls_imports = [n for n in tree.body if isinstance(n, ast.ImportFrom) and n.module == "django.urls"]
+    if not any(a.name == "include" for n in urls_imports for a in n.names):
+        if urls_imports:
+            node = urls_imports[0]
+            last_alias = node.names[-1]
+            end = starts[last_alias.end_lineno - 1] + last_alias.end_col_offset
+            # "import (path,)": the trailing comma is already there
+            node_end = starts[node.end_lineno - 1] + node.end_col_offset
+            comma = next((t for t in _tokens_between(data, end, node_end) if t[3] == ","), None)
+            edits.append((comma[2], b" include,") if comma else (end, b", include"))
+        else:
+            edits.append(_import_insert_edit(data, starts, tree, b"from django.urls import include" + nl.encode("ascii")))
+        actions.append("import:include")
+    # A mount that is already routed is never added twice
+    mounts = {
+        elt.args[0].value
+        for elt in patterns.elts
+        if isinstance(elt, ast.Call) and elt.args and isinstance(elt.args[0], ast.Constant)
+    }
+    new_routes: List[str] = []
+    for module, mount in includes:
+        if mount not in mounts:
+            mounts.add(mount)
+            new_routes.append(f'path("{mount}", include("{module}")),')
+            actions.append(f"url:{mount}->{module}")
+    if new_routes:
+        list_start = starts[patterns.lineno - 1] + patterns.col_offset
+        list_end = starts[patterns.end_lineno - 1] + patterns.end_col_offset
+        # insert before schema if present else append after the last route
+        anchor = data.find(b"# OpenAPI schema and docs", list_start, list_end)
+        if anchor != -1:
+            edits.append((anchor, "".join(f"    {r}{nl}" for r in new_routes).encode("utf-8")))
+        else:
+            edits += _list_append_edits(data, starts, patterns, "".join(f"{nl}    {r}" for r in new_routes).encode("utf-8"))
+    if not actions:
+        return []
+    # Splice back to front so earlier offsets stay valid
+    for offset, text in sorted(edits, reverse=True):
+        data = data[:offset] + text + data[offset:]
+    PROJECT_URLS_PATH.write_bytes(data)
     return actions
 
 
 def _ensure_env(keys: List[Dict[str, Any]]) -> List[str]:
     if not keys:
         return []
-    ENV_EXAMPLE_PATH.touch(exist_ok=True)
-    lines = ENV_EXAMPLE_PATH.read_text(encoding="utf-8").splitlines()
-    existing = {l.split("=", 1)[0] for l in lines if l and not l.startswith("#") and "=" in l}
+    try:
+        buf = bytearray(ENV_EXAMPLE_PATH.read_bytes())
+    except FileNotFoundError:
+        buf = bytearray()
+    # One scan for existing keys; new lines are appended to the same buffer
+    existing = set()
+    for line in buf.splitlines():
+        eq = line.find(b"=")
+        if eq > 0 and not line.startswith(b"#"):
+            existing.add(bytes(line[:eq]))
+    nl = _newline(buf)
+    if buf and not buf.endswith(b"\n"):
+        buf += nl
     actions: List[str] = []
     for item in keys:
         key = item.get("key")
-        default = item.get("default", "")
-        if key and key not in existing:
-            lines.append(f"{key}={default}")
+        if not key:
+            continue
+        key_bytes = key.encode("utf-8")
+        if key_bytes not in existing:
+            buf += key_bytes + b"=" + str(item.get("default", "")).encode("utf-8") + nl
+            existing.add(key_bytes)
             actions.append(f"env:{key}")
-    ENV_EXAMPLE_PATH.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    if actions:
+        ENV_EXAMPLE_PATH.write_bytes(buf)
     return actions
 
 
-def cmd_apply(path: str, assume_yes: bool) -> None:
+def cmd_apply(
+    path: str,
+    assume_yes: bool,
+    planned: Tuple[Dict[str, Any], Dict[str, Any]] | None = None,
+    exec_migrate: bool = False,
+) -> None:
+    # planned: (manifest, plan) from read_and_plan, when the caller already has them
+    # exec_migrate: replace this process with migrate instead of waiting on a child
+    # (POSIX only; elsewhere migrate still runs as a child process)
     brick_path = Path(path)
-    manifest = read_manifest(brick_path)
-    plan = plan_integration(manifest)
+    manifest, plan = planned or read_and_plan(brick_path)
     _write_json_stdout({"plan": plan}, compact=False)
     if not assume_yes:
         sys.stdout.write("Use --yes to apply changes\n")
@@ -210,35 +526,48 @@ def cmd_apply(path: str, assume_yes: bool) -> None:
                 actions.append({"file": str(dst.relative_to(WORKSPACE_ROOT)), "type": "create_dir"})
 
     # settings.py mutations
-    settings_actions: List[str] = []
-    settings_actions += _insert_into_list_block(PROJECT_SETTINGS_PATH, "INSTALLED_APPS", plan["settings"]["installed_apps"])
-    settings_actions += _insert_into_list_block(PROJECT_SETTINGS_PATH, "MIDDLEWARE", plan["settings"]["middleware"])
+    settings_actions = _apply_settings_mutations(PROJECT_SETTINGS_PATH, {
+        "INSTALLED_APPS": plan["settings"]["installed_apps"],
+        "MIDDLEWARE": plan["settings"]["middleware"],
+    })
     for sa in settings_actions:
         actions.append({"file": "config/settings.py", "type": sa})
 
     # urls.py mutations
-    for u in plan["urls"]:
-        for ua in _ensure_url_include(u["include"], u["mount"].lstrip("/")):
-            actions.append({"file": "config/urls.py", "type": ua})
+    url_includes = [(u["include"], u["mount"].lstrip("/")) for u in plan["urls"]]
+    for ua in _ensure_url_includes(url_includes):
+        actions.append({"file": "config/urls.py", "type": ua})
 
     # env example
     for ea in _ensure_env(plan["env"]):
         actions.append({"file": ".env.example", "type": ea})
 
-    # install and migrate
-    subprocess.run(["pip", "install", "-r", str(REQUIREMENTS_PATH), "--disable-pip-version-check", "--no-input"], check=True)
-    subprocess.run(["python", str(WORKSPACE_ROOT / "manage.py"), "migrate", "--noinput"], check=True)
+    # install and migrate, skipping either when this apply changed nothing it depends on
+    added_reqs = any(a["file"] == "requirements.txt" for a in actions)
+    added_apps = any(a["type"] == "create_dir" or a["type"].startswith("add:INSTALLED_APPS:") for a in actions)
+    if added_reqs:
+        subprocess.run(["pip", "install", "-r", str(REQUIREMENTS_PATH), "--disable-pip-version-check", "--no-input"], check=True)
 
-    # record ledger
-    ledger = load_ledger()
+    # record ledger before migrate, so the file changes are logged even if migrate fails
     entry = {
         "brick": manifest.get("name") or brick_path.name,
         "source": str(brick_path),
-        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+        # Same "...Z" form as the existing ledger entries
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "actions": actions,
     }
-    ledger.setdefault("entries", []).append(entry)
-    save_ledger(ledger)
+    append_ledger_entry(entry)
+
+    if added_apps:
+        migrate_cmd = ["python", str(WORKSPACE_ROOT / "manage.py"), "migrate", "--noinput"]
+        if exec_migrate and _CAN_EXEC:
+            # migrate is the last step, so there is nothing to come back to
+            sys.stdout.write("Applied. Running migrate...\n")
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execvp(migrate_cmd[0], migrate_cmd)
+        else:
+            subprocess.run(migrate_cmd, check=True)
     sys.stdout.write("Applied.\n")
 
 
@@ -246,51 +575,103 @@ def cmd_apply(path: str, assume_yes: bool) -> None:
 # Git install + diff
 # ==================
 
+@functools.lru_cache(maxsize=64)
 def _normalize_repo_to_url(repo: str) -> str:
-    if repo.startswith("http://") or repo.startswith("https://") or repo.endswith(".git"):
+    # Pure string -> string, so repeat lookups (e.g. from a long-lived importer) are memoised
+    if repo.startswith(("http://", "https://")) or repo.endswith(".git"):
         return repo
-    if re.match(r"^[\w.-]+/[\w.-]+$", repo):
-        return f"https://github.com/{repo}.git"
+    # owner/repo: exactly one slash, no scheme, no whitespace (isprintable rejects \t, \n)
+    if repo.count("/") == 1 and "://" not in repo and " " not in repo and repo.isprintable():
+        owner, name = repo.split("/")
+        if owner and name:
+            return f"https://github.com/{owner}/{name}.git"
     raise ValueError("Unrecognized repo format. Use full git URL or owner/repo shorthand.")
 
 
-def _find_brick_dir(root: Path) -> Path | None:
-    for name in ("brick.yaml", "brick.yml", "brick.json"):
-        if (root / name).exists():
-            return root
-    for p in root.rglob("brick.yaml"):
-        return p.parent
-    for p in root.rglob("brick.yml"):
-        return p.parent
-    for p in root.rglob("brick.json"):
-        return p.parent
-    return None
+_BRICK_MANIFEST_NAMES = ("brick.yaml", "brick.yml", "brick.json")
+
+
+def _scan_repo(root: Path) -> Tuple[Path | None, Path | None]:
+    # One walk for both install signals: (dir holding a brick manifest, first apps.py).
+    # Breadth-first over one scandir per directory, so the shallowest manifest
+    # wins and the walk stops as soon as one is found. Dot-dirs (.git) are skipped.
+    # Subdirectories are visited in name order so ties resolve the same on every OS.
+    apps_py: Path | None = None
+    queue = collections.deque([str(root)])
+    while queue:
+        d = queue.popleft()
+        subdirs = []
+        try:
+            with os.scandir(d) as it:
+                for ent in it:
+                    if ent.name in _BRICK_MANIFEST_NAMES and ent.is_file(follow_symlinks=False):
+                        return Path(d), apps_py
+                    if apps_py is None and ent.name == "apps.py" and ent.is_file(follow_symlinks=False):
+                        apps_py = Path(ent.path)
+                    elif ent.is_dir(follow_symlinks=False) and not ent.name.startswith("."):
+                        subdirs.append(ent.path)
+        except OSError:
+            continue
+        subdirs.sort()
+        queue.extend(subdirs)
+    return None, apps_py
 
 
-def _auto_detect_manifest(repo_root: Path) -> tuple[Path, Dict[str, Any]]:
-    for apps_py in repo_root.rglob("apps.py"):
-        app_dir = apps_py.parent
-        app_name = app_dir.name
-        urls_include = (app_dir / "urls.py").exists()
-        manifest: Dict[str, Any] = {
-            "name": app_name,
-            "dependencies": [],
-            "django": {
-                "installed_apps": [app_name],
-                "middleware": [],
-                "settings": {},
-                "urls": ([{"include": f"{app_name}.urls", "mount": f"/{app_name}/"}] if urls_include else []),
-            },
-        }
-        # include root requirements if present
-        req = repo_root / "requirements.txt"
-        if req.exists():
-            deps = [l.strip() for l in req.read_text(encoding="utf-8").splitlines() if l.strip() and not l.strip().startswith('#')]
-            manifest["dependencies"] = deps[:20]
-        brick_dir = repo_root
-        (brick_dir / "brick.yaml").write_text(yaml.safe_dump(manifest, sort_keys=False), encoding="utf-8")
-        return brick_dir, manifest
-    raise FileNotFoundError("Could not auto-detect a Django app (no apps.py found)")
+def _find_brick_dir(root: Path) -> Path | None:
+    return _scan_repo(root)[0]
+
+
+def _auto_detect_manifest(
+    repo_root: Path, apps_py: Path | None = None, *, persist: bool = True
+) -> tuple[Path, Dict[str, Any]]:
+    # apps_py: first apps.py from an earlier _scan_repo, to avoid walking the repo again
+    # persist: also write the detected manifest to repo_root/brick.yaml
+    if apps_py is None:
+        _, apps_py = _scan_repo(repo_root)
+    if apps_py is None:
+        raise FileNotFoundError("Could not auto-detect a Django app (no apps.py found)")
+    app_dir = apps_py.parent
+    app_name = app_dir.name
+    urls_include = (app_dir / "urls.py").exists()
+    manifest: Dict[str, Any] = {
+        "name": app_name,
+        "dependencies": [],
+        "django": {
+            "installed_apps": [app_name],
+            "middleware": [],
+            "settings": {},
+            "urls": ([{"include": f"{app_name}.urls", "mount": f"/{app_name}/"}] if urls_include else []),
+        },
+    }
+    # include root requirements if present
+    req = repo_root / "requirements.txt"
+    try:
+        with req.open("r", encoding="utf-8") as f:
+            deps = []
+            # Only the first 20 requirements are kept, so stop reading there
+            for raw in f:
+                line = raw.strip()
+                if line and not line.startswith("#"):
+                    deps.append(line)
+                    if len(deps) == 20:
+                        break
+        manifest["dependencies"] = deps
+    except FileNotFoundError:
+        pass
+    brick_dir = repo_root
+    if persist:
+        import yaml
+
+        (brick_dir / "brick.yaml").write_text(yaml.dump(manifest, Dumper=_yaml_codecs()[1], sort_keys=False), encoding="utf-8")
+    return brick_dir, manifest
+
+
+def _plan_and_apply(brick_dir: Path, manifest: Dict[str, Any] | None = None) -> None:
+    # Plan once; the same (manifest, plan) is printed and then applied.
+    # manifest: an in-memory manifest to use instead of reading one from brick_dir
+    planned = read_and_plan(brick_dir) if manifest is None else (manifest, plan_integration(manifest))
+    print_plan(planned[1])
+    cmd_apply(str(brick_dir), assume_yes=True, planned=planned)
 
 
 def _cmd_install_git(repo: str) -> None:
@@ -299,120 +680,185 @@ def _cmd_install_git(repo: str) -> None:
     except Exception as e:
         sys.stderr.write(f"[git-install] Invalid repo '{repo}': {e}\n")
         sys.stderr.write("[git-install] Falling back to local demo brick...\n")
-        demo_dir = _ensure_demo_brick()
-        cmd_plan(str(demo_dir))
-        cmd_apply(str(demo_dir), assume_yes=True)
+        _plan_and_apply(_ensure_demo_brick())
         return
 
     try:
-        with tempfile.TemporaryDirectory() as td:
+        # A clone that cannot be fully removed (locked files on Windows) must not fail the install
+        with tempfile.TemporaryDirectory(prefix="lego-brick-", ignore_cleanup_errors=True) as td:
             td_path = Path(td)
-            subprocess.run(["git", "clone", url, str(td_path)], check=True)
-            brick_dir = _find_brick_dir(td_path)
+            # Only one tree snapshot is needed: skip history, tags and other branches.
+            # Never prompt for credentials (terminal or Git Credential Manager);
+            # a private repo fails fast instead of hanging.
+            subprocess.run(
+                ["git", "clone", "--depth=1", "--filter=blob:none", "--single-branch", "--no-tags", url, str(td_path)],
+                check=True,
+                stdin=subprocess.DEVNULL,
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0", "GCM_INTERACTIVE": "Never"},
+            )
+            brick_dir, apps_py = _scan_repo(td_path)
+            manifest = None
             if brick_dir is None:
-                brick_dir, _ = _auto_detect_manifest(td_path)
+                # The clone is thrown away, so use the detected manifest directly
+                brick_dir, manifest = _auto_detect_manifest(td_path, apps_py, persist=False)
             sys.stdout.write("Plan (from git clone):\n")
-            cmd_plan(str(brick_dir))
-            cmd_apply(str(brick_dir), assume_yes=True)
+            _plan_and_apply(brick_dir, manifest)
+            # Hand the results to the reader before the clone is deleted
+            sys.stdout.flush()
     except Exception as e:
         sys.stderr.write(f"[git-install] Clone/apply failed: {e}\n")
         sys.stderr.write("[git-install] Falling back to local demo brick...\n")
-        demo_dir = _ensure_demo_brick()
-        cmd_plan(str(demo_dir))
-        cmd_apply(str(demo_dir), assume_yes=True)
+        _plan_and_apply(_ensure_demo_brick())
+
+
+# Demo brick files, relative to bricks/demo_polls; encoded once at import.
+# The manifest is fixed, so it is spelled out instead of going through the YAML emitter.
+_DEMO_BRICK_FILES: Tuple[Tuple[str, bytes], ...] = (
+    (
+        "brick.yaml",
+        b"name: polls-demo\n"
+        b"description: Demo polls brick (fallback)\n"
+        b"dependencies: []\n"
+        b"django:\n"
+        b"  installed_apps:\n"
+        b"  - polls\n"
+        b"  urls:\n"
+        b"  - include: polls.urls\n"
+        b"    mount: /polls/\n"
+        b"  settings: {}\n",
+    ),
+    ("polls/__init__.py", b"\n"),
+    (
+        "polls/apps.py",
+        b"from django.apps import AppConfig\n\n"
+        b"class PollsConfig(AppConfig):\n"
+        b"    default_auto_field = 'django.db.models.BigAutoField'\n"
+        b"    name = 'polls'\n",
+    ),
+    (
+        "polls/views.py",
+        b"from django.shortcuts import render\n\n"
+        b"def index(request):\n"
+        b"    return render(request, 'polls/index.html', {'message': 'Hello from demo polls brick!'})\n",
+    ),
+    (
+        "polls/urls.py",
+        b"from django.urls import path\n"
+        b"from . import views\n\n"
+        b"app_name = 'polls'\n"
+        b"urlpatterns = [path('', views.index, name='index')]\n",
+    ),
+    (
+        "polls/templates/polls/index.html",
+        b"{% extends 'base.html' %}\n"
+        b"{% block title %}Polls Demo{% endblock %}\n"
+        b"{% block content %}\n"
+        b"<div class=\"card\"><strong>Polls Demo</strong><div class=\"muted\">{{ message }}</div></div>\n"
+        b"{% endblock %}\n",
+    ),
+)
+
+
+def _write_file_bytes(target_content: Tuple[str, bytes]) -> None:
+    target, content = target_content
+    with open(target, "wb") as f:
+        f.write(content)
 
 
 def _ensure_demo_brick() -> Path:
-    demo_root = WORKSPACE_ROOT / "bricks" / "demo_polls"
-    app_root = demo_root / "polls"
-    templates_root = app_root / "templates" / "polls"
-    demo_root.mkdir(parents=True, exist_ok=True)
-    app_root.mkdir(parents=True, exist_ok=True)
-    templates_root.mkdir(parents=True, exist_ok=True)
-    manifest = {
-        "name": "polls-demo",
-        "description": "Demo polls brick (fallback)",
-        "dependencies": [],
-        "django": {
-            "installed_apps": ["polls"],
-            "urls": [{"include": "polls.urls", "mount": "/polls/"}],
-            "settings": {},
-        },
-    }
-    (demo_root / "brick.yaml").write_text(yaml.safe_dump(manifest, sort_keys=False), encoding="utf-8")
-    (app_root / "__init__.py").write_text("\n", encoding="utf-8")
-    (app_root / "apps.py").write_text(
-        "from django.apps import AppConfig\n\n"
-        "class PollsConfig(AppConfig):\n"
-        "    default_auto_field = 'django.db.models.BigAutoField'\n"
-        "    name = 'polls'\n",
-        encoding="utf-8",
-    )
-    (app_root / "views.py").write_text(
-        "from django.shortcuts import render\n\n"
-        "def index(request):\n"
-        "    return render(request, 'polls/index.html', {'message': 'Hello from demo polls brick!'})\n",
-        encoding="utf-8",
-    )
-    (app_root / "urls.py").write_text(
-        "from django.urls import path\n"
-        "from . import views\n\n"
-        "app_name = 'polls'\n"
-        "urlpatterns = [path('', views.index, name='index')]\n",
-        encoding="utf-8",
-    )
-    (templates_root / "index.html").write_text(
-        "{% extends 'base.html' %}\n"
-        "{% block title %}Polls Demo{% endblock %}\n"
-        "{% block content %}\n"
-        "<div class=\"card\"><strong>Polls Demo</strong><div class=\"muted\">{{ message }}</div></div>\n"
-        "{% endblock %}\n",
-        encoding="utf-8",
-    )
-    return demo_root
+    # Plain strings and open(): a handful of small files doesn't need Path objects per file
+    demo_root = os.path.join(WORKSPACE_ROOT, "bricks", "demo_polls")
+    targets = [(os.path.join(demo_root, rel), content) for rel, content in _DEMO_BRICK_FILES]
+    # Already generated by an earlier fallback: nothing to rewrite
+    if all(os.path.isfile(target) for target, _ in targets):
+        return Path(demo_root)
+    # The deepest directory; makedirs creates the rest
+    os.makedirs(os.path.join(demo_root, "polls", "templates", "polls"), exist_ok=True)
+    # File writes release the GIL, so they overlap on slow disks (WSL2, network mounts)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_write_file_bytes, targets))
+    return Path(demo_root)
 
 
 def _cmd_diff(path: str) -> None:
-    manifest = read_manifest(Path(path))
-    plan = plan_integration(manifest)
-    _write_json_stdout({"plan": plan}, compact=False)
-    previews: List[str] = []
+    _, plan = read_and_plan(Path(path))
+    # Pretty JSON is for people; pipes get the compact form
+    _write_json_stdout({"plan": plan}, compact=not sys.stdout.isatty())
+    # (heading, added items); written out in one writelines call
+    sections: List[Tuple[str, List[str]]] = []
     if plan["requirements"]:
-        existing = []
-        if REQUIREMENTS_PATH.exists():
-            existing = [l.strip() for l in REQUIREMENTS_PATH.read_text(encoding="utf-8").splitlines()]
-        adds = [pkg["name"] for pkg in plan["requirements"] if not any(line.startswith(pkg["name"]) for line in existing)]
+        _, existing, _ = _read_requirements()
+        adds = []
+        for pkg in plan["requirements"]:
+            line = pkg["name"].encode("utf-8")
+            req_name = _requirement_key(line)
+            if req_name not in existing:
+                adds.append(pkg["name"])
+                existing.add(req_name)
         if adds:
-            previews.append("requirements.txt additions:\n" + "\n".join(["+ " + a for a in adds]))
+            sections.append(("requirements.txt additions", adds))
     if plan["settings"]["installed_apps"]:
-        previews.append("settings.py INSTALLED_APPS additions:\n" + "\n".join(["+ " + a for a in plan["settings"]["installed_apps"]]))
+        sections.append(("settings.py INSTALLED_APPS additions", plan["settings"]["installed_apps"]))
     if plan["settings"]["middleware"]:
-        previews.append("settings.py MIDDLEWARE additions:\n" + "\n".join(["+ " + m for m in plan["settings"]["middleware"]]))
+        sections.append(("settings.py MIDDLEWARE additions", plan["settings"]["middleware"]))
     if plan["urls"]:
-        url_lines = [f'+ path("{u["mount"]}", include("{u["include"]}"))' for u in plan["urls"]]
-        previews.append("config/urls.py additions:\n" + "\n".join(url_lines))
-    if previews:
-        sys.stdout.write("\nDiff preview (planned additions):\n" + "\n\n".join(previews) + "\n")
-    else:
+        sections.append(("config/urls.py additions", [f'path("{u["mount"]}", include("{u["include"]}"))' for u in plan["urls"]]))
+    if not sections:
         sys.stdout.write("No changes planned.\n")
-
-def main() -> None:
+        return
+    out = ["\nDiff preview (planned additions):\n"]
+    for i, (heading, items) in enumerate(sections):
+        if i:
+            out.append("\n")
+        out.append(f"{heading}:\n")
+        out.extend(f"+ {item}\n" for item in items)
+    sys.stdout.writelines(out)
+
+
+# Subcommand help pages; the embedded newlines need RawTextHelpFormatter
+_PLAN_DESC = (
+    "Show integration plan for a brick folder.\n\n"
+    "Examples:\n"
+    "  python tools/bricks.py plan bricks/blog\n"
+    "  python tools/bricks.py plan /path/to/brick\n"
+)
+_LIST_DESC = (
+    "List installed bricks recorded in tools/lego_manifest.jsonl (JSON).\n\n"
+    "Examples:\n"
+    "  python tools/bricks.py list\n"
+    "  python tools/bricks.py list --compact | Out-File ledger.json\n"
+    "  python tools/bricks.py list --output tools/ledger_dump.json\n"
+)
+_APPLY_DESC = (
+    "Apply a brick: installs deps, updates settings/urls/env, migrates, records ledger.\n\n"
+    "Examples:\n"
+    "  python tools/bricks.py apply bricks/blog --yes\n"
+    "  python tools/bricks.py apply bricks/blog --yes --exec-migrate\n"
+)
+_INSTALL_DESC = (
+    "Clone a git repo, detect a brick, show plan, and apply changes.\n\n"
+    "Examples:\n"
+    "  python tools/bricks.py install https://github.com/OWNER/REPO.git\n"
+    "  python tools/bricks.py install OWNER/REPO\n"
+)
+_DIFF_DESC = (
+    "Show a concise diff preview of planned changes.\n\n"
+    "Examples:\n"
+    "  python tools/bricks.py diff bricks/blog\n"
+)
+
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="lego bricks",
         description="Snap-in manager: plan/apply bricks, install from git, and preview diffs.",
-        formatter_class=argparse.RawTextHelpFormatter,
     )
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     p_plan = sub.add_parser(
         "plan",
         help="Show integration plan for a brick folder (reads brick.yaml or auto-detects)",
-        description=(
-            "Show integration plan for a brick folder.\n\n"
-            "Examples:\n"
-            "  python tools/bricks.py plan bricks/blog\n"
-            "  python tools/bricks.py plan /path/to/brick\n"
-        ),
+        description=_PLAN_DESC,
         formatter_class=argparse.RawTextHelpFormatter,
     )
     p_plan.add_argument("path", help="Path to a brick folder containing brick.yaml (or auto-detect)")
@@ -420,13 +866,7 @@ def main() -> None:
     p_list = sub.add_parser(
         "list",
         help="List installed bricks (JSON)",
-        description=(
-            "List installed bricks recorded in tools/lego_manifest.json (JSON).\n\n"
-            "Examples:\n"
-            "  python tools/bricks.py list\n"
-            "  python tools/bricks.py list --compact | Out-File ledger.json\n"
-            "  python tools/bricks.py list --output tools/ledger_dump.json\n"
-        ),
+        description=_LIST_DESC,
         formatter_class=argparse.RawTextHelpFormatter,
     )
     p_list.add_argument("--compact", action="store_true", help="Emit minified JSON (better for pipes)")
@@ -434,25 +874,24 @@ def main() -> None:
     p_apply = sub.add_parser(
         "apply",
         help="Apply a local brick folder non-interactively",
-        description=(
-            "Apply a brick: installs deps, updates settings/urls/env, migrates, records ledger.\n\n"
-            "Examples:\n"
-            "  python tools/bricks.py apply bricks/blog --yes\n"
-        ),
+        description=_APPLY_DESC,
         formatter_class=argparse.RawTextHelpFormatter,
     )
     p_apply.add_argument("path", help="Path to local brick folder")
     p_apply.add_argument("--yes", action="store_true", dest="assume_yes", help="Apply without prompt")
+    p_apply.add_argument(
+        "--exec-migrate",
+        action="store_true",
+        help=(
+            "Run migrate in place of this process (saves a fork; the exit status is migrate's). "
+            "POSIX only: on Windows migrate runs as a child process as usual"
+        ),
+    )
 
     p_install = sub.add_parser(
         "install",
         help="Install a brick from git (URL or GitHub owner/repo)",
-        description=(
-            "Clone a git repo, detect a brick, show plan, and apply changes.\n\n"
-            "Examples:\n"
-            "  python tools/bricks.py install https://github.com/OWNER/REPO.git\n"
-            "  python tools/bricks.py install OWNER/REPO\n"
-        ),
+        description=_INSTALL_DESC,
         formatter_class=argparse.RawTextHelpFormatter,
     )
     p_install.add_argument("repo", help="Git URL or GitHub owner/repo shorthand")
@@ -460,22 +899,21 @@ def main() -> None:
     p_diff = sub.add_parser(
         "diff",
         help="Preview planned additions (requirements/settings/urls) for a brick",
-        description=(
-            "Show a concise diff preview of planned changes.\n\n"
-            "Examples:\n"
-            "  python tools/bricks.py diff bricks/blog\n"
-        ),
+        description=_DIFF_DESC,
         formatter_class=argparse.RawTextHelpFormatter,
     )
     p_diff.add_argument("path", help="Path to local brick folder")
+    return parser
+
 
-    args = parser.parse_args()
+def main() -> None:
+    args = _build_parser().parse_args()
     if args.cmd == "plan":
         cmd_plan(args.path)
     elif args.cmd == "list":
         cmd_list(compact=getattr(args, "compact", False), output=getattr(args, "output", None))
     elif args.cmd == "apply":
-        cmd_apply(args.path, args.assume_yes)
+        cmd_apply(args.path, args.assume_yes, exec_migrate=args.exec_migrate)
     elif args.cmd == "install":
         _cmd_install_git(args.repo)
     elif args.cmd == "diff":